@@ -1,18 +1,62 @@
-——import requests
+import requests
 import json
 import time
 import logging
 import os
+import random
+import re
+import select
+import signal
+import socket
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
+from logging.handlers import RotatingFileHandler
 from typing import Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-# 配置日志
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # 未安装 orjson 时退回标准库
+    _json_loads = json.loads
+
+# 配置日志，按大小轮转避免日志文件无限增长
+# 挂在根日志器上，urllib3 的重试等日志同样写入日志文件
+_log_handler = RotatingFileHandler('ddns.log', maxBytes=1_000_000, backupCount=3, encoding='utf-8')
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
-    filename='ddns.log'
+    handlers=[_log_handler]
 )
 logger = logging.getLogger(__name__)
 
+# 严格匹配 IPv4 地址，用于过滤查询服务返回的 HTML 错误页等非法内容
+_IPV4_RE = re.compile(r'^(?:(?:25[0-5]|2[0-4]\d|[01]?\d\d?)\.){3}(?:25[0-5]|2[0-4]\d|[01]?\d\d?)$')
+
+# 使用多个服务获取公网 IP，提高可靠性
+_IP_SERVICES = (
+    'https://ip.3322.net',        # 3322 IP查询服务
+    'https://ipinfo.io/ip',       # IPInfo服务
+    'https://icanhazip.com',      # 简单的纯文本IP服务
+    'https://v4.ident.me',        # 强制IPv4服务（避免返回IPv6）
+    'https://checkip.amazonaws.com', # AWS检查IP服务
+    'https://ifconfig.co/ip',     # ifconfig服务
+    'https://whatismyip.akamai.com',  # Akamai官方IP查询
+    'https://ident.me',           # 支持IPv6的服务
+    'http://ip.42.pl/raw',        # 纯文本IP服务
+    'https://ipecho.net/plain'    # Echo服务
+)
+
+# 缓存的 domain_id / record_id 有效期（秒），过期后启动时重新查询
+_ID_CACHE_TTL = 7 * 24 * 3600
+
+# 每隔多少次检查向 DNSPod 确认一次记录是否与本地一致
+_VERIFY_EVERY = 12
+
+# Record.Modify 返回的域名 ID 错误、记录 ID 错误状态码，出现时需要重新获取 ID
+_ID_INVALID_CODES = ('6', '8')
+
 class DNSPodDDNS:
     def __init__(self, login_token: str, domain: str, sub_domain: str = '@'):
         """
@@ -30,18 +74,127 @@ class DNSPodDDNS:
         self.record_id = None
         self.current_ip = None
         self.ip_cache_file = 'current_ip.txt'
+        # domain_id / record_id 的获取时间，随缓存一起保存
+        self._ids_ts: Optional[float] = None
+        # 上次 Record.List 响应的 ETag 及当时的记录信息，用于条件请求
+        self._record_list_etag: Optional[str] = None
+        self._etag_record: Optional[Dict[str, Any]] = None
+        # 已写入缓存文件的内容，用于跳过无变化的写入
+        self._persisted_state = None
         
         # DNSPod API 基础URL
         self.base_url = 'https://dnsapi.cn'
         
+        # 各 API 请求共用的参数，Record.Modify 的固定参数在获取到 ID 后缓存
+        self._base_data = {'login_token': login_token, 'format': 'json'}
+        self._modify_template: Optional[Dict[str, Any]] = None
+        
+        # DNSPod API 共用会话，复用连接避免每次请求重新握手；
+        # 连接错误及 429/5xx 响应由 urllib3 按指数退避自动重试
+        self._session = requests.Session()
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset(['GET', 'POST'])
+        )
+        self._session.mount('https://', HTTPAdapter(max_retries=retry, pool_connections=2, pool_maxsize=4))
+        self._session.headers['User-Agent'] = 'DNSPodDDNS/1.0'
+        
+        # 查询服务列表可通过环境变量 IP_SERVICES（逗号分隔）覆盖
+        services = [u.strip() for u in os.getenv('IP_SERVICES', ','.join(_IP_SERVICES)).split(',') if u.strip()]
+        if not services:
+            logger.warning("环境变量 IP_SERVICES 未包含有效的查询服务，使用默认服务列表")
+            services = list(_IP_SERVICES)
+        # 启动时打乱顺序分散请求，之后每次成功的服务移到最前面优先使用
+        random.shuffle(services)
+        self._probe_order = deque(services)
+        
+        # 并发查询公网 IP 的线程池，每批同时请求的服务数；
+        # 已发出的请求无法取消，线程数需覆盖所有批次，避免前一批卡住的请求占满线程导致后续批次排队
+        self._probe_batch_size = 4
+        self._ip_executor = ThreadPoolExecutor(max_workers=max(1, len(services)))
+        # 仍在执行中的查询请求，跨轮次保留；未结束的服务在下一轮跳过，避免新请求排在卡住的线程后面
+        self._pending_probes: Dict[str, Any] = {}
+        
+        # 公网 IP 查询共用会话，按主机保持长连接
+        self._ip_session = requests.Session()
+        self._ip_session.headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        
+        # 检查失败后的重试等待时间（秒），成功后重置
+        self._backoff = 1.0
+        
+        # 停止标志及用于唤醒等待的 socketpair；写 socket 不涉及锁，可在信号处理函数中安全调用
+        self._stop_requested = False
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._wakeup_w.setblocking(False)
+        
         # 检查 IP 缓存文件
-        if os.path.exists(self.ip_cache_file):
-            with open(self.ip_cache_file, 'r') as f:
-                self.current_ip = f.read().strip()
+        self._load_cache()
                 
         # 验证配置
         self._validate_config()
 
+    def _load_cache(self):
+        """从缓存文件读取当前 IP，以及未过期的 domain_id 和 record_id"""
+        if not os.path.exists(self.ip_cache_file):
+            return
+        try:
+            with open(self.ip_cache_file, 'r') as f:
+                content = f.read().strip()
+            try:
+                cache = json.loads(content)
+            except ValueError:
+                # 兼容旧版本仅保存 IP 的纯文本缓存
+                self.current_ip = content or None
+                return
+            # 缓存只对生成它的域名、子域名和 Token ID 有效，配置变化后整体丢弃
+            if any(cache.get(k) != v for k, v in self._cache_owner().items()):
+                logger.info("缓存文件与当前配置不符，忽略缓存的记录信息")
+                return
+            self.current_ip = cache.get('ip')
+            if cache.get('etag'):
+                # ID 过期后仍可凭 ETag 向 DNSPod 确认记录是否变化
+                self._record_list_etag = cache['etag']
+                self._etag_record = {
+                    'domain_id': cache.get('domain_id'),
+                    'sub_domain': self.sub_domain,
+                    'record_id': cache.get('record_id'),
+                    'ip': cache.get('ip')
+                }
+            ts = cache.get('ts')
+            if ts and time.time() - ts < _ID_CACHE_TTL:
+                self.domain_id = cache.get('domain_id')
+                self.record_id = cache.get('record_id')
+                self._ids_ts = ts
+                self._persisted_state = cache
+        except Exception as e:
+            logger.warning(f"读取缓存文件失败: {str(e)}")
+
+    def _cache_owner(self) -> Dict[str, str]:
+        """缓存所属的配置：域名、子域名和 Token ID（login_token 逗号前的部分）"""
+        return {
+            'domain': self.domain,
+            'sub_domain': self.sub_domain,
+            'token_id': self.login_token.split(',', 1)[0]
+        }
+
+    def _invalidate_cache(self):
+        """清除已缓存的 domain_id 和 record_id，下次使用时重新查询"""
+        self.domain_id = None
+        self.record_id = None
+        self._ids_ts = None
+        self._modify_template = None
+        self._record_list_etag = None
+        self._etag_record = None
+        self._persisted_state = None
+        try:
+            if os.path.exists(self.ip_cache_file):
+                os.remove(self.ip_cache_file)
+        except Exception as e:
+            logger.warning(f"删除缓存文件失败: {str(e)}")
+
     def _validate_config(self):
         """验证配置有效性"""
         if not self.login_token or ',' not in self.login_token:
@@ -55,28 +208,37 @@ class DNSPodDDNS:
     def get_public_ip(self) -> Optional[str]:
         """获取当前公网 IP 地址"""
         try:
-            # 使用多个服务获取公网 IP，提高可靠性
-            services = [
-            'https://ip.3322.net',        # 3322 IP查询服务
-            'https://ipinfo.io/ip',       # IPInfo服务
-            'https://icanhazip.com',      # 简单的纯文本IP服务
-            'https://v4.ident.me',        # 强制IPv4服务（避免返回IPv6）
-            'https://checkip.amazonaws.com', # AWS检查IP服务
-            'https://ifconfig.co/ip',     # ifconfig服务
-            'https://whatismyip.akamai.com',  # Akamai官方IP查询
-            'https://ident.me',           # 支持IPv6的服务
-            'http://ip.42.pl/raw',        # 纯文本IP服务
-            'https://ipecho.net/plain'    # Echo服务
-            ]
+            # 按当前顺序复制一份，避免遍历时调整顺序；上一轮仍未结束的服务本轮跳过
+            self._pending_probes = {s: f for s, f in self._pending_probes.items() if not f.done()}
+            services = [s for s in self._probe_order if s not in self._pending_probes]
+            if self._pending_probes:
+                logger.warning(f"以下服务的上次查询仍未结束，本次跳过: {', '.join(self._pending_probes)}")
             
-            for service in services:
+            # 每批并发请求多个服务，取最先成功的结果；整批失败再尝试下一批
+            for i in range(0, len(services), self._probe_batch_size):
+                batch = services[i:i + self._probe_batch_size]
+                futures = {self._ip_executor.submit(self._ip_session.get, service, timeout=5): service
+                           for service in batch}
+                self._pending_probes.update((service, future) for future, service in futures.items())
                 try:
-                    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-                    response = requests.get(service, headers=headers, timeout=5)
-                    if response.status_code == 200:
-                        return response.text.strip()
-                except Exception as e:
-                    logger.warning(f"获取公网 IP 失败 ({service}): {str(e)}")
+                    for future in as_completed(futures, timeout=6):
+                        service = futures[future]
+                        try:
+                            response = future.result()
+                            if response.status_code == 200:
+                                text = response.text.strip()
+                                if _IPV4_RE.match(text):
+                                    self._probe_order.remove(service)
+                                    self._probe_order.appendleft(service)
+                                    return text
+                                logger.warning(f"获取公网 IP 失败 ({service}): 返回内容不是有效的 IPv4 地址")
+                        except Exception as e:
+                            logger.warning(f"获取公网 IP 失败 ({service}): {str(e)}")
+                except FuturesTimeoutError:
+                    logger.warning(f"获取公网 IP 超时: {', '.join(batch)}")
+                finally:
+                    for future in futures:
+                        future.cancel()
             
             logger.error("所有 IP 查询服务均失败")
             return None
@@ -84,33 +246,81 @@ class DNSPodDDNS:
             logger.error(f"获取公网 IP 时发生异常: {str(e)}")
             return None
 
+    def _parse_response(self, response: requests.Response, action: str) -> Optional[Dict[str, Any]]:
+        """HTTP 状态码为 200 时解析 API 返回的 JSON，否则记录错误并返回 None"""
+        if response.status_code != 200:
+            logger.error(f"{action}失败: HTTP {response.status_code}，响应内容: {response.text[:200]}")
+            return None
+        return _json_loads(response.content)
+
     def get_domain_id(self) -> Optional[str]:
         """获取域名 ID"""
         if self.domain_id:
             return self.domain_id
             
         url = f"{self.base_url}/Domain.List"
-        data = {
-            'login_token': self.login_token,
-            'format': 'json'
-        }
+        data = self._base_data
         
-        try:
-            response = requests.post(url, data=data)
-            result = response.json()
+        response = self._session.post(url, data=data, timeout=10)
+        result = self._parse_response(response, "获取域名 ID")
+        if result is None:
+            return None
+        
+        if result.get('status', {}).get('code') == '1':
+            for domain in result.get('domains', []):
+                if domain.get('name') == self.domain:
+                    self.domain_id = domain.get('id')
+                    logger.info(f"获取域名 ID 成功: {self.domain_id}")
+                    return self.domain_id
+            logger.error(f"未找到域名: {self.domain}，API返回: {result}")
+        else:
+            logger.error(f"获取域名 ID 失败: {result.get('status', {}).get('message')}，完整响应: {result}")
             
-            if result.get('status', {}).get('code') == '1':
-                for domain in result.get('domains', []):
-                    if domain.get('name') == self.domain:
-                        self.domain_id = domain.get('id')
-                        logger.info(f"获取域名 ID 成功: {self.domain_id}")
-                        return self.domain_id
-                logger.error(f"未找到域名: {self.domain}，API返回: {result}")
-            else:
-                logger.error(f"获取域名 ID 失败: {result.get('status', {}).get('message')}，完整响应: {result}")
-                
-        except Exception as e:
-            logger.error(f"获取域名 ID 时发生异常: {str(e)}")
+        return None
+
+    def _list_record(self, domain_id: str) -> Optional[Dict[str, Any]]:
+        """调用 Record.List 查询子域名的 A 记录，返回记录 ID 与记录值；ETag 命中时直接沿用缓存的记录"""
+        url = f"{self.base_url}/Record.List"
+        data = {**self._base_data, 'domain_id': domain_id, 'sub_domain': self.sub_domain}
+        
+        # 同一域名、子域名下带上次的 ETag 发起条件请求，记录未变化时 DNSPod 不返回响应体
+        headers = {}
+        etag_record = self._etag_record
+        if (self._record_list_etag and etag_record and etag_record.get('domain_id') == domain_id
+                and etag_record.get('sub_domain') == self.sub_domain):
+            headers['If-None-Match'] = self._record_list_etag
+        
+        response = self._session.post(url, data=data, headers=headers, timeout=10)
+        if headers:
+            # 按 RFC 9110，POST 请求的 If-None-Match 命中时应返回 412，因此 304 和 412 都视为记录未变化
+            if response.status_code in (304, 412):
+                logger.debug(f"记录未变化 (HTTP {response.status_code})，沿用缓存的记录: {etag_record}")
+                return etag_record
+            # 其他响应说明 ETag 已不可用，丢弃后按需不带条件重新请求一次
+            self._record_list_etag = None
+            self._etag_record = None
+            if response.status_code != 200:
+                logger.warning(f"条件请求记录列表返回 HTTP {response.status_code}，改为普通请求重试")
+                response = self._session.post(url, data=data, timeout=10)
+        result = self._parse_response(response, "获取记录 ID")
+        if result is None:
+            return None
+        
+        if result.get('status', {}).get('code') == '1':
+            for record in result.get('records', []):
+                if record.get('name') == self.sub_domain and record.get('type') == 'A':
+                    found = {
+                        'domain_id': domain_id,
+                        'sub_domain': self.sub_domain,
+                        'record_id': record.get('id'),
+                        'ip': record.get('value')
+                    }
+                    self._record_list_etag = response.headers.get('ETag')
+                    self._etag_record = found
+                    return found
+            logger.error(f"未找到记录: {self.sub_domain}.{self.domain}，API返回: {result}")
+        else:
+            logger.error(f"获取记录 ID 失败: {result.get('status', {}).get('message')}，完整响应: {result}")
             
         return None
 
@@ -122,79 +332,146 @@ class DNSPodDDNS:
         domain_id = self.get_domain_id()
         if not domain_id:
             return None
-            
-        url = f"{self.base_url}/Record.List"
-        data = {
-            'login_token': self.login_token,
-            'format': 'json',
-            'domain_id': domain_id,
-            'sub_domain': self.sub_domain
-        }
         
-        try:
-            response = requests.post(url, data=data)
-            result = response.json()
-            
-            if result.get('status', {}).get('code') == '1':
-                for record in result.get('records', []):
-                    if record.get('name') == self.sub_domain and record.get('type') == 'A':
-                        self.record_id = record.get('id')
-                        logger.info(f"获取记录 ID 成功: {self.record_id}")
-                        return self.record_id
-                logger.error(f"未找到记录: {self.sub_domain}.{self.domain}，API返回: {result}")
-            else:
-                logger.error(f"获取记录 ID 失败: {result.get('status', {}).get('message')}，完整响应: {result}")
-                
-        except Exception as e:
-            logger.error(f"获取记录 ID 时发生异常: {str(e)}")
-            
-        return None
+        record = self._list_record(domain_id)
+        if not record:
+            return None
+        self.record_id = record['record_id']
+        self.current_ip = record['ip']
+        self._ids_ts = time.time()
+        logger.info(f"获取记录 ID 成功: {self.record_id}，当前记录值: {self.current_ip}")
+        return self.record_id
+
+    def _verify_record(self):
+        """确认 DNSPod 上的记录仍与本地一致，不一致（如被手动修改）时以 DNSPod 为准"""
+        if not self.domain_id or not self.record_id:
+            return
+        record = self._list_record(self.domain_id)
+        if not record:
+            return
+        if record['record_id'] != self.record_id or record['ip'] != self.current_ip:
+            logger.warning(f"DNSPod 上的记录与本地不一致: 记录 ID {self.record_id} -> {record['record_id']}，"
+                           f"记录值 {self.current_ip} -> {record['ip']}")
+            self.record_id = record['record_id']
+            self.current_ip = record['ip']
+        self._save_current_ip(self.current_ip)
+
+    def _get_modify_template(self, domain_id: str, record_id: str) -> Dict[str, Any]:
+        """获取 Record.Modify 的固定请求参数，ID 不变时复用"""
+        template = self._modify_template
+        if not template or template['domain_id'] != domain_id or template['record_id'] != record_id:
+            template = {
+                **self._base_data,
+                'domain_id': domain_id,
+                'record_id': record_id,
+                'sub_domain': self.sub_domain,
+                'record_type': 'A',
+                'record_line': '默认'
+            }
+            self._modify_template = template
+        return template
+
+    def _modify_record(self, ip: str) -> Optional[Dict[str, Any]]:
+        """调用 Record.Modify 将记录值修改为指定 IP，返回 API 响应"""
+        url = f"{self.base_url}/Record.Modify"
+        data = {**self._get_modify_template(self.domain_id, self.record_id), 'value': ip}
+        response = self._session.post(url, data=data, timeout=10)
+        return self._parse_response(response, "更新记录")
 
     def update_record(self, ip: str) -> bool:
-        """更新 DNS 记录"""
-        domain_id = self.get_domain_id()
-        record_id = self.get_record_id()
+        """更新 DNS 记录，domain_id 和 record_id 需已在启动时获取"""
+        if not self.domain_id or not self.record_id:
+            logger.error("尚未获取域名或记录 ID，无法更新记录")
+            return False
         
-        if not domain_id or not record_id:
+        result = self._modify_record(ip)
+        if result is None:
             return False
-            
-        url = f"{self.base_url}/Record.Modify"
-        data = {
-            'login_token': self.login_token,
-            'format': 'json',
-            'domain_id': domain_id,
-            'record_id': record_id,
-            'sub_domain': self.sub_domain,
-            'record_type': 'A',
-            'record_line': '默认',
-            'value': ip
-        }
         
-        try:
-            response = requests.post(url, data=data)
-            result = response.json()
-            
-            if result.get('status', {}).get('code') == '1':
-                logger.info(f"成功更新记录: {self.sub_domain}.{self.domain} -> {ip}")
-                self.current_ip = ip
-                self._save_current_ip(ip)
+        if result.get('status', {}).get('code') in _ID_INVALID_CODES:
+            # 缓存的 ID 已失效，重新获取一次后重试
+            logger.warning(f"缓存的域名或记录 ID 已失效，将重新获取: {result.get('status', {}).get('message')}")
+            self._invalidate_cache()
+            self._bootstrap()
+            if not self.record_id:
+                return False
+            if self.current_ip == ip:
+                logger.info(f"记录已是最新: {self.sub_domain}.{self.domain} -> {ip}")
                 return True
-            else:
-                logger.error(f"更新记录失败: {result.get('status', {}).get('message')}，完整响应: {result}")
-                
-        except Exception as e:
-            logger.error(f"更新记录时发生异常: {str(e)}")
-            
+            result = self._modify_record(ip)
+            if result is None:
+                return False
+        
+        if result.get('status', {}).get('code') == '1':
+            logger.info(f"成功更新记录: {self.sub_domain}.{self.domain} -> {ip}")
+            self.current_ip = ip
+            # 记录已修改，之前的记录列表 ETag 不再有效
+            self._record_list_etag = None
+            self._etag_record = None
+            self._save_current_ip(ip)
+            return True
+        
+        logger.error(f"更新记录失败: {result.get('status', {}).get('message')}，完整响应: {result}")
         return False
 
+    def _bootstrap(self):
+        """启动时以 DNSPod 上的记录为准，初始化 domain_id、record_id 和当前 IP"""
+        if self.domain_id and self.record_id and self.current_ip:
+            return
+        if self.get_record_id() and self.current_ip:
+            self._save_current_ip(self.current_ip)
+
     def _save_current_ip(self, ip: str):
-        """保存当前 IP 到缓存文件"""
+        """保存当前 IP、domain_id 和 record_id 到缓存文件，内容未变化时不写入"""
+        state = {
+            **self._cache_owner(),
+            'ip': ip,
+            'domain_id': self.domain_id,
+            'record_id': self.record_id,
+            'ts': self._ids_ts,
+            'etag': self._record_list_etag
+        }
+        if state == self._persisted_state:
+            return
+        # 先写临时文件再原子替换，避免写入中途崩溃留下损坏的缓存
+        tmp_file = f"{self.ip_cache_file}.tmp"
         try:
-            with open(self.ip_cache_file, 'w') as f:
-                f.write(ip)
+            with open(tmp_file, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_file, self.ip_cache_file)
+            self._persisted_state = state
         except Exception as e:
             logger.warning(f"保存 IP 缓存文件失败: {str(e)}")
 
+    def stop(self):
+        """请求停止 DDNS 服务，可在信号处理函数或其他线程中调用"""
+        self._stop_requested = True
+        try:
+            self._wakeup_w.send(b'\0')
+        except OSError:
+            # 缓冲区已满或已关闭，说明已有未处理的唤醒
+            pass
+
+    def _wait(self, timeout: float) -> bool:
+        """等待指定秒数或直到收到停止请求，返回是否已请求停止"""
+        if not self._stop_requested:
+            select.select([self._wakeup_r], [], [], timeout)
+        return self._stop_requested
+
+    def close(self):
+        """关闭 HTTP 会话，释放连接池"""
+        self._ip_executor.shutdown(wait=False)
+        self._session.close()
+        self._ip_session.close()
+        self._wakeup_r.close()
+        self._wakeup_w.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
     def run(self, check_interval: int = 300):
         """运行 DDNS 服务
         
@@ -203,29 +480,59 @@ class DNSPodDDNS:
         """
         logger.info(f"DNSPod DDNS 服务启动 - {self.sub_domain}.{self.domain}")
         
-        while True:
+        try:
+            self._bootstrap()
+        except Exception as e:
+            logger.error(f"初始化 DNS 记录信息时发生异常: {str(e)}")
+        
+        checks = 0
+        while not self._stop_requested:
+            # 以固定的截止时间调度，扣除本次检查的耗时，避免间隔漂移
+            next_tick = time.monotonic() + check_interval
+            succeeded = False
+            checks += 1
             try:
+                # 启动时未能获取到记录信息则在每次检查前重试
+                if not self.domain_id or not self.record_id:
+                    self._bootstrap()
+                elif checks % _VERIFY_EVERY == 0:
+                    # 定期以条件请求核对记录，未变化时几乎没有开销；失败不影响本次 IP 检查
+                    try:
+                        self._verify_record()
+                    except Exception as e:
+                        logger.warning(f"核对 DNS 记录时发生异常: {str(e)}")
+                
                 new_ip = self.get_public_ip()
                 if not new_ip:
-                    logger.warning("无法获取公网 IP，将在下次检查时重试")
-                    time.sleep(check_interval)
-                    continue
-                    
-                # 检查 IP 是否变化
-                if new_ip != self.current_ip:
-                    logger.info(f"检测到 IP 变化: {self.current_ip} -> {new_ip}")
-                    if self.update_record(new_ip):
-                        logger.info(f"IP 更新成功: {new_ip}")
-                    else:
-                        logger.error("IP 更新失败")
+                    logger.warning(f"无法获取公网 IP，{self._backoff:.0f} 秒后重试")
                 else:
-                    logger.debug(f"IP 未变化: {new_ip}")
+                    # 检查 IP 是否变化
+                    if new_ip != self.current_ip:
+                        logger.info(f"检测到 IP 变化: {self.current_ip} -> {new_ip}")
+                        if self.update_record(new_ip):
+                            logger.info(f"IP 更新成功: {new_ip}")
+                            succeeded = True
+                        else:
+                            logger.error(f"IP 更新失败，{self._backoff:.0f} 秒后重试")
+                    else:
+                        logger.debug(f"IP 未变化: {new_ip}")
+                        succeeded = True
                     
             except Exception as e:
                 logger.error(f"运行 DDNS 检查时发生异常: {str(e)}")
                 
-            # 等待下一次检查
-            time.sleep(check_interval)
+            # 失败时指数退避重试，成功后等待到下一次检查的截止时间
+            if succeeded:
+                self._backoff = 1.0
+                delay = max(0, next_tick - time.monotonic())
+            else:
+                delay = self._backoff
+                # 最长不超过检查间隔，避免持续失败时比正常检查更频繁地请求 API
+                self._backoff = min(self._backoff * 2, 60, check_interval)
+            if self._wait(delay):
+                break
+        
+        logger.info("DDNS 服务已停止")
 
 if __name__ == "__main__":
     # 配置信息
@@ -243,16 +550,21 @@ if __name__ == "__main__":
     
     # 创建并运行 DDNS 客户端
     try:
-        ddns_client = DNSPodDDNS(
+        with DNSPodDDNS(
             login_token=CONFIG['login_token'],
             domain=CONFIG['domain'],
             sub_domain=CONFIG['sub_domain']
-        )
-        ddns_client.run(check_interval=CONFIG['check_interval'])
+        ) as ddns_client:
+            # SIGTERM（如 docker stop）和 SIGINT 均触发优雅退出
+            signal.signal(signal.SIGTERM, lambda *_: ddns_client.stop())
+            signal.signal(signal.SIGINT, lambda *_: ddns_client.stop())
+            ddns_client.run(check_interval=CONFIG['check_interval'])
+        print("DDNS 服务已停止")
     except ValueError as ve:
         logger.error(f"配置错误: {str(ve)}")
         print(f"配置错误: {str(ve)}")
     except KeyboardInterrupt:
+        # 信号处理函数安装前（初始化期间）按下 Ctrl+C
         logger.info("DDNS 服务已停止")
         print("DDNS 服务已停止")
     except Exception as e: